@@ -1,8 +1,36 @@
+import asyncio
+import difflib
+import hashlib
+import logging
+import os
+import random
+import sys
 import time
+import json
 import requests
 from pathlib import Path
 from typing import TypedDict
 
+from pydantic import BaseModel, Field
+
+try:
+    import orjson
+except ImportError:  # orjson 未安裝時退回標準庫 json
+    orjson = None
+
+if orjson is not None:
+    # requests 的 resp.json() 透過 complexjson 解析；orjson.loads 介面相容，
+    # 大型回應（任務資訊、batch 結果）的反序列化快 3-10 倍。
+    # 本專案不使用 json= 參數送出請求，不受 orjson.dumps 回傳 bytes 影響。
+    requests.models.complexjson = orjson
+
+# 熱路徑共用的 JSON 解析器（orjson 可用時優先）
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+from requests.adapters import HTTPAdapter
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+from urllib3.util.retry import Retry
+
 # LangGraph 必要元件
 from langgraph.graph import StateGraph, END
 
@@ -10,6 +38,19 @@ from langgraph.graph import StateGraph, END
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+# ============================================
+# Logging 設定
+# ============================================
+# 以 logging 取代 print：等級由 LOG_LEVEL 環境變數控制（預設 INFO），
+# 低於門檻的訊息（例如轉錄預覽）完全不做格式化，不佔 I/O
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    format="%(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
 
 # ============================================
 # 🔧 設定區域（請根據需要修改）
@@ -23,10 +64,96 @@ LLM_BASE_URL = "https://ws-02.wade0426.me/v1"
 LLM_API_KEY = ""  # KEY 留空
 LLM_MODEL = "google/gemma-3-27b-it"
 
+# Batch API：結果本來就是存檔用、非互動，走 Batch 可省約 50% 費用
+# （LLM_BASE_URL 的伺服器需支援 /v1/batches 才能開啟；關閉時走即時路徑）
+USE_BATCH_API = False
+
+# 融合呼叫：單一結構化輸出請求同時產生摘要與逐字稿，
+# 長逐字稿只需送進 LLM 一次，prompt token 成本約減半；
+# 改為 False 退回「逐字稿／摘要並行雙節點」路徑
+FUSE_LLM_CALLS = True
+
+# 上傳前把音檔降轉為 16 kHz 單聲道 Opus：ASR 模型通常只吃這個取樣率，
+# 檔案可縮小 5-10 倍，直接縮短上傳時間（需要系統已安裝 ffmpeg；
+# 無損流程可改為 False 上傳原始檔）
+PREPROCESS_AUDIO = True
+
 # ASR API 設定
 ASR_BASE = "https://3090api.huannago.com"
 ASR_CREATE_URL = f"{ASR_BASE}/api/v1/subtitle/tasks"
 ASR_AUTH = ("nutc2504", "nutc2504")
+# 等待轉錄結果的總時限（事件等待與輪詢共用，不會疊加）
+ASR_TIMEOUT_S = 600.0
+
+# 摘要 map-reduce 設定：超過 chunk 大小的長逐字稿會切塊並行摘要再合併
+SUMMARY_CHUNK_SIZE = 4000
+SUMMARY_CHUNK_OVERLAP = 200
+SUMMARY_MAX_CONCURRENCY = 10
+
+# 共用 Session：所有 ASR 請求共用連線池（keep-alive），
+# 避免每次輪詢都重新建立 TCP + TLS 連線
+SESSION = requests.Session()
+SESSION.auth = ASR_AUTH
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+# ASR 事件端點（SSE）能力快取：第一次探測後記住結果，
+# 不支援的伺服器之後直接走輪詢路徑
+_ASR_EVENT_SUPPORT: dict[str, bool] = {}
+
+
+def _wait_done_event(task_id: str, deadline: float) -> str:
+    """訂閱 ASR 任務的 SSE 事件流，等任務結束事件
+
+    事件驅動比固定頻率輪詢平均省下約一半的等待時間（任務完成後
+    立刻得知，不用等下一輪）。deadline 是 time.monotonic 基準的絕對
+    截止時間，與後續輪詢共用同一個總時限。
+
+    回傳值：
+    - "done"：任務完成，字幕可以抓了
+    - "failed"：伺服器回報任務失敗，不必再輪詢
+    - ""：無法從事件得知結果（端點不支援、串流中斷、超時），改走輪詢
+    """
+    if _ASR_EVENT_SUPPORT.get(ASR_BASE) is False:
+        return ""
+
+    read_timeout = max(1.0, deadline - time.monotonic())
+    events_url = f"{ASR_BASE}/api/v1/subtitle/tasks/{task_id}/events"
+    try:
+        with SESSION.get(events_url, stream=True, timeout=(5, read_timeout)) as resp:
+            if resp.status_code != 200:
+                _ASR_EVENT_SUPPORT[ASR_BASE] = False
+                return ""
+            _ASR_EVENT_SUPPORT[ASR_BASE] = True
+            for line in resp.iter_lines(decode_unicode=True):
+                if time.monotonic() > deadline:
+                    break
+                # 只解析 SSE 資料列（形如 data: {"status": "done"}），
+                # 明確比對 status 欄位，避免誤判 payload 裡恰好出現的字樣
+                if not line or not line.startswith("data:"):
+                    continue
+                try:
+                    status = _json_loads(line[len("data:"):].strip()).get("status", "")
+                except Exception:
+                    continue
+                if status == "done":
+                    logger.info("   📡 收到 ASR 完成事件")
+                    return "done"
+                if status in ("failed", "error", "cancelled"):
+                    logger.warning("   ⚠️ ASR 任務事件回報失敗（status=%s）", status)
+                    return "failed"
+    except Exception as e:
+        logger.warning("   ⚠️ 事件串流不可用，改走輪詢: %s", e)
+        # 只有在端點從未成功回應過時才記為不支援；
+        # 已驗證支援的伺服器偶發斷線不應永久關閉事件路徑
+        if _ASR_EVENT_SUPPORT.get(ASR_BASE) is not True:
+            _ASR_EVENT_SUPPORT[ASR_BASE] = False
+    return ""
 
 # ============================================
 # 1. 初始化 LLM
@@ -35,9 +162,326 @@ llm = ChatOpenAI(
     base_url=LLM_BASE_URL,
     api_key=LLM_API_KEY,
     model=LLM_MODEL,
-    temperature=0
+    temperature=0,
+    # 429/逾時等暫時性錯誤自動以指數退避重試，
+    # 避免 ASR 跑完幾分鐘後整個流程因單次 LLM 失敗而中斷
+    max_retries=3,
+)
+
+# ============================================
+# 系統提示（模組層級常數）
+# ============================================
+# 提示內容長且固定，抽成常數確保每次請求 byte-for-byte 相同，
+# 讓 OpenAI 相容伺服器的自動 prefix caching 能重用已算好的 KV state，
+# 降低 TTFT 與重複 token 成本
+MINUTES_SYSTEM_PROMPT = """你是一位專業的會議記錄員。請將以下語音轉錄內容整理成詳細的逐字稿。
+
+## 輸出要求：
+1. 使用 Markdown 表格格式
+2. 按時間順序列出每一句話
+3. 保留時間戳（如果有的話）
+4. 不要省略任何內容
+5. 使用繁體中文
+
+## 輸出格式範例：
+## 📋 詳細記錄（Detailed Minutes）
+### 會議發言紀錄 — Podcast
+
+| **時間** | **發言內容** |
+|----------|-------------|
+| 00:00:00 - 00:00:03 | 歡迎來到天下文化 podcast，我是阿布阿哥。 |
+| 00:00:03 - 00:00:10 | 今天要介紹一本非常棒的書... |
+"""
+
+SUMMARY_SYSTEM_PROMPT = """你是一位專業的內容分析師。請閱讀以下語音轉錄內容，並產生一份重點摘要。
+
+## 輸出要求：
+1. 開頭標題：## 🎯 重點摘要（Executive Summary）
+2. 列出主題名稱
+3. 歸納 3-5 個關鍵重點
+4. 如果有結論或建議，請標註
+5. 如果有待辦事項，請列出
+6. 使用繁體中文，條列式呈現
+
+## 輸出格式範例：
+## 🎯 重點摘要（Executive Summary）
+### 主題：《努力但不費力》Podcast 導讀
+
+本次會議重點討論了葛瑞格麥乞昂的《努力但不費力》一書。
+
+**決策結論：**
+* 鼓勵團隊成員重新審視「努力」的定義...
+
+**待辦事項（Action Items）：**
+* 學習「不費力」的三個階段：狀態、行動、成果
+* 反思自身工作模式...
+"""
+
+SUMMARY_MAP_SYSTEM_PROMPT = (
+    "你是一位專業的內容分析師。請用繁體中文、條列式摘要以下會議片段的重點，"
+    "保留具體的決策、數字與待辦事項。"
 )
 
+# Chain 在模組載入時建好一次：模板解析與 Runnable 組裝不必每次節點呼叫重來
+MINUTES_CHAIN = ChatPromptTemplate.from_messages([
+    ("system", MINUTES_SYSTEM_PROMPT),
+    ("user", "{content}")
+]) | llm | StrOutputParser()
+
+SUMMARY_CHAIN = ChatPromptTemplate.from_messages([
+    ("system", SUMMARY_SYSTEM_PROMPT),
+    ("user", "{content}")
+]) | llm | StrOutputParser()
+
+SUMMARY_MAP_CHAIN = ChatPromptTemplate.from_messages([
+    ("system", SUMMARY_MAP_SYSTEM_PROMPT),
+    ("user", "{content}")
+]) | llm | StrOutputParser()
+
+# 融合呼叫的系統提示：合併逐字稿與摘要兩份指示，轉錄內容只需送一次
+REPORT_SYSTEM_PROMPT = """你是一位專業的會議記錄員兼內容分析師。請閱讀以下語音轉錄內容，同時產出 summary（重點摘要）與 detailed_minutes（詳細逐字稿）兩個欄位。
+
+## summary 欄位要求：
+1. 開頭標題：## 🎯 重點摘要（Executive Summary）
+2. 列出主題名稱
+3. 歸納 3-5 個關鍵重點
+4. 如果有結論或建議，請標註
+5. 如果有待辦事項，請列出
+6. 使用繁體中文，條列式呈現
+
+## detailed_minutes 欄位要求：
+1. 開頭標題：## 📋 詳細記錄（Detailed Minutes）
+2. 使用 Markdown 表格格式，欄位為 **時間** 與 **發言內容**
+3. 按時間順序列出每一句話
+4. 保留時間戳（如果有的話）
+5. 不要省略任何內容
+6. 使用繁體中文
+"""
+
+
+class Report(BaseModel):
+    """融合呼叫的結構化輸出：一次取回摘要與逐字稿"""
+    summary: str = Field(description="重點摘要（Markdown，繁體中文）")
+    detailed_minutes: str = Field(description="詳細逐字稿（Markdown 表格，含時間戳）")
+
+
+REPORT_CHAIN = ChatPromptTemplate.from_messages([
+    ("system", REPORT_SYSTEM_PROMPT),
+    ("user", "{content}")
+]) | llm.with_structured_output(Report)
+
+
+# ============================================
+# LLM 結果快取（exact-match）
+# ============================================
+# 以 sha256(系統提示 + 內容) 為 key，將 LLM 輸出存成 ./out/cache/<hash>.md
+# 重跑同一段音檔（例如開發、除錯）時直接讀快取，省下整次 token 成本與等待
+LLM_CACHE_DIR = Path("./out/cache")
+
+
+def _llm_cache_path(system_prompt: str, content: str) -> Path:
+    """計算快取檔案路徑（key = sha256(系統提示 + 內容)）"""
+    digest = hashlib.sha256((system_prompt + content).encode("utf-8")).hexdigest()
+    return LLM_CACHE_DIR / f"{digest}.md"
+
+
+def _llm_cache_get(system_prompt: str, content: str) -> str | None:
+    """命中快取時回傳先前的 LLM 輸出，否則回傳 None"""
+    cache_path = _llm_cache_path(system_prompt, content)
+    if cache_path.exists():
+        return cache_path.read_text(encoding="utf-8")
+    return None
+
+
+def _llm_cache_put(system_prompt: str, content: str, result: str) -> None:
+    """將 LLM 輸出寫入快取"""
+    LLM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    _llm_cache_path(system_prompt, content).write_text(result, encoding="utf-8")
+
+
+# ============================================
+# Batch API 聚合器
+# ============================================
+class _LLMBatcher:
+    """將同一時間窗內送出的 chat 請求聚合成一個 Batch API 工作
+
+    逐字稿與摘要兩個節點並行執行，幾乎同時送出請求；
+    聚合後只建立一個 batch（JSONL 兩筆），輪詢一次即可取回全部結果。
+    """
+
+    def __init__(self, window_s: float = 1.0):
+        self._window_s = window_s
+        self._pending: list[tuple[str, str, dict | None, asyncio.Future]] = []
+        self._flush_task: asyncio.Task | None = None
+
+    async def submit(
+        self, system_prompt: str, content: str, response_format: dict | None = None
+    ) -> str:
+        """排入一筆 chat 請求，等 batch 完成後回傳該筆的回覆文字
+
+        response_format 可傳 OpenAI 的 json_schema 規格，
+        讓結構化輸出（融合節點）也能走 Batch 路徑
+        """
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending.append((system_prompt, content, response_format, future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush())
+        return await future
+
+    async def _flush(self) -> None:
+        # 只要還有待處理請求就持續開新的收集窗：
+        # 批次處理（上傳＋輪詢可能長達數分鐘）期間才送達的請求
+        # 會留在 _pending，由下一輪迴圈接手，不會卡住等不到 flush
+        while self._pending:
+            # 等一個小時間窗，讓並行節點的請求都進到同一個 batch
+            await asyncio.sleep(self._window_s)
+            batch_items, self._pending = self._pending, []
+            if batch_items:
+                await self._run_batch(batch_items)
+
+    async def _run_batch(self, batch_items: list) -> None:
+        """送出一個 batch 並把結果發回各請求的 future"""
+        import io
+
+        from openai import AsyncOpenAI
+
+        client = AsyncOpenAI(base_url=LLM_BASE_URL, api_key=LLM_API_KEY)
+        try:
+            lines = []
+            for idx, (system_prompt, content, response_format, _) in enumerate(batch_items):
+                body = {
+                    "model": LLM_MODEL,
+                    "temperature": 0,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": content},
+                    ],
+                }
+                if response_format is not None:
+                    body["response_format"] = response_format
+                lines.append(json.dumps({
+                    "custom_id": str(idx),
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": body,
+                }, ensure_ascii=False))
+
+            input_file = await client.files.create(
+                file=io.BytesIO("\n".join(lines).encode("utf-8")),
+                purpose="batch",
+            )
+            batch = await client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h",
+            )
+
+            # 與 ASR 輪詢相同的指數退避策略
+            base_delay, max_delay = 2.0, 30.0
+            attempt = 0
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                delay = min(max_delay, base_delay * 2 ** min(attempt, 6))
+                await asyncio.sleep(delay + random.uniform(0, 0.5 * delay))
+                batch = await client.batches.retrieve(batch.id)
+                attempt += 1
+
+            if batch.status != "completed":
+                raise RuntimeError(f"Batch 工作未完成（狀態：{batch.status}）")
+
+            output = await client.files.content(batch.output_file_id)
+            results: dict[str, str] = {}
+            for line in output.text.splitlines():
+                record = _json_loads(line)
+                body = record["response"]["body"]
+                results[record["custom_id"]] = body["choices"][0]["message"]["content"]
+
+            for idx, (_, _, _, future) in enumerate(batch_items):
+                future.set_result(results[str(idx)])
+        except Exception as e:
+            for _, _, _, future in batch_items:
+                if not future.done():
+                    future.set_exception(e)
+
+
+BATCHER = _LLMBatcher()
+
+
+async def _stream_chain(chain, inputs: dict, partial_path: Path) -> str:
+    """串流執行 chain，邊收 token 邊附寫到部分結果檔
+
+    相比阻塞的 ainvoke，token 一抵達就寫入磁碟：
+    - 長逐字稿不必等整份生成完才看得到進度
+    - 中途中斷（Ctrl+C、斷線）時已生成的部分仍保留在檔案裡
+    """
+    parts: list[str] = []
+    partial_path.parent.mkdir(parents=True, exist_ok=True)
+    with partial_path.open("w", encoding="utf-8") as fp:
+        async for chunk in chain.astream(inputs):
+            parts.append(chunk)
+            fp.write(chunk)
+    return "".join(parts)
+
+
+# ============================================
+# 摘要語意快取（near-duplicate）
+# ============================================
+# exact-match 快取只在內容一字不差時命中；ASR 重跑同一段音檔常有微小差異
+# （標點、斷句），這裡改比對轉錄文字的相似度，≥ 門檻值就重用先前的摘要。
+# 不依賴外部 embedding 服務，使用標準庫 difflib 計算相似度即可。
+SEMANTIC_CACHE_DIR = Path("./out/cache/semantic")
+SEMANTIC_CACHE_THRESHOLD = 0.95
+# 有界前綴比對長度：完整 ratio() 是 O(n^2)，先對固定長度前綴比對粗篩，
+# 避免對整份長逐字稿做昂貴比對後才發現不相似
+SEMANTIC_CACHE_PREFIX_LEN = 2000
+
+
+def _semantic_cache_get(content: str) -> str | None:
+    """在已快取的轉錄文字中找相似度 ≥ 門檻的項目，命中則回傳其摘要
+
+    比對成本由便宜到昂貴逐層過濾：
+    1. 長度差超過 5% 的候選不可能達到相似度門檻，直接跳過
+    2. 只對固定長度前綴算 ratio（成本與逐字稿總長無關）
+    3. quick_ratio 是整份內容相似度的上界
+    4. 以上都通過才對完整內容做 O(n^2) 的 ratio 比對
+    """
+    if not SEMANTIC_CACHE_DIR.exists():
+        return None
+    for txt_path in SEMANTIC_CACHE_DIR.glob("*.txt"):
+        cached_content = txt_path.read_text(encoding="utf-8")
+
+        # 長度粗篩：相似度 ≥ 0.95 時兩邊長度差必然很小
+        max_len = max(len(content), len(cached_content))
+        if max_len and abs(len(content) - len(cached_content)) > 0.05 * max_len:
+            continue
+
+        # 有界前綴比對：同講者的不同會議在這裡就會被刷掉
+        prefix_matcher = difflib.SequenceMatcher(
+            None,
+            content[:SEMANTIC_CACHE_PREFIX_LEN],
+            cached_content[:SEMANTIC_CACHE_PREFIX_LEN],
+        )
+        if prefix_matcher.ratio() < SEMANTIC_CACHE_THRESHOLD:
+            continue
+
+        matcher = difflib.SequenceMatcher(None, content, cached_content)
+        # quick_ratio 是上界，先便宜地過濾明顯不相似的項目
+        if matcher.quick_ratio() < SEMANTIC_CACHE_THRESHOLD:
+            continue
+        if matcher.ratio() >= SEMANTIC_CACHE_THRESHOLD:
+            summary_path = txt_path.with_suffix(".md")
+            if summary_path.exists():
+                return summary_path.read_text(encoding="utf-8")
+    return None
+
+
+def _semantic_cache_put(content: str, summary: str) -> None:
+    """將（轉錄文字, 摘要）配對寫入語意快取"""
+    SEMANTIC_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    (SEMANTIC_CACHE_DIR / f"{digest}.txt").write_text(content, encoding="utf-8")
+    (SEMANTIC_CACHE_DIR / f"{digest}.md").write_text(summary, encoding="utf-8")
+
+
 # ============================================
 # 2. 定義 State（共享狀態）
 # ============================================
@@ -52,121 +496,245 @@ class MeetingState(TypedDict):
     detailed_minutes: str     # 輸出：詳細逐字稿
     summary: str              # 輸出：重點摘要
     final_report: str         # 輸出：最終報告
+    pending_writes: list      # 背景磁碟寫入任務（writer 節點收尾時等待）
 
 # ============================================
 # 3. 定義 Nodes（節點函數）
 # ============================================
 
-def asr_node(state: MeetingState) -> dict:
+async def asr_node(state: MeetingState) -> dict:
     """
     🎙️ ASR 節點：語音轉文字
-    
+
     功能：
+    - 先以音檔 sha256 查轉錄快取，命中就跳過整個 ASR 流程
     - 上傳音檔到 ASR API
     - 等待轉錄完成
     - 取得 TXT（純文字）和 SRT（含時間軸）格式
-    
+    - 磁碟寫入丟到背景執行，與後續 LLM 節點重疊
+
     輸入：state["audio_path"]
-    輸出：txt_content, srt_content
+    輸出：txt_content, srt_content, pending_writes
     """
-    print("\n" + "="*50)
-    print("🎙️ [ASR 節點] 開始語音轉文字...")
-    print("="*50)
+    logger.info("\n" + "="*50)
+    logger.info("🎙️ [ASR 節點] 開始語音轉文字...")
+    logger.info("="*50)
     
     audio_path = state["audio_path"]
-    print(f"   📁 音檔路徑: {audio_path}")
+    logger.info("   📁 音檔路徑: %s", audio_path)
     
     # 建立輸出目錄
     out_dir = Path("./out")
     out_dir.mkdir(exist_ok=True)
-    
-    # -------- 步驟 1: 建立 ASR 任務 --------
-    print("   📤 上傳音檔到 ASR 服務...")
-    try:
+
+    # -------- 步驟 0: 以音檔雜湊查轉錄快取 --------
+    # 同一個音檔重跑時直接重用先前的轉錄結果，跳過整個上傳＋輪詢流程
+
+    def _hash_audio() -> str:
+        h = hashlib.sha256()
         with open(audio_path, "rb") as f:
-            response = requests.post(
-                ASR_CREATE_URL, 
-                files={"audio": f}, 
-                timeout=60, 
-                auth=ASR_AUTH
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    try:
+        audio_hash = await asyncio.to_thread(_hash_audio)
+    except FileNotFoundError:
+        logger.error("   ❌ 錯誤：找不到音檔 %s", audio_path)
+        raise
+
+    cached_txt_path = out_dir / f"{audio_hash}.txt"
+    cached_srt_path = out_dir / f"{audio_hash}.srt"
+    if cached_txt_path.exists():
+        logger.info("   ⚡ 命中轉錄快取（音檔雜湊 %s...），跳過 ASR", audio_hash[:12])
+        return {
+            "txt_content": cached_txt_path.read_text(encoding="utf-8"),
+            "srt_content": (
+                cached_srt_path.read_text(encoding="utf-8")
+                if cached_srt_path.exists() else ""
+            ),
+            "pending_writes": []
+        }
+
+    # -------- 步驟 0.5: 音檔前處理（降轉取樣率，縮小上傳體積） --------
+    upload_path = Path(audio_path)
+    if PREPROCESS_AUDIO:
+
+        def _preprocess():
+            try:
+                import ffmpeg
+            except ImportError:
+                logger.warning("   ⚠️ 未安裝 ffmpeg-python，跳過音檔前處理")
+                return None
+            tmp = out_dir / f"{audio_hash}_16k.ogg"
+            try:
+                (
+                    ffmpeg.input(str(audio_path))
+                    .output(str(tmp), ac=1, ar=16000, codec="libopus", **{"b:a": "24k"})
+                    .overwrite_output()
+                    .run(quiet=True)
+                )
+            except Exception as e:
+                logger.warning("   ⚠️ 音檔前處理失敗，改用原始檔上傳: %s", e)
+                return None
+            return tmp
+
+        processed_path = await asyncio.to_thread(_preprocess)
+        if processed_path is not None:
+            logger.info("   🔉 已降轉為 16 kHz 單聲道 Opus: %s", processed_path)
+            upload_path = processed_path
+
+    # -------- 步驟 1: 建立 ASR 任務 --------
+    logger.info("   📤 上傳音檔到 ASR 服務...")
+
+    def _upload() -> requests.Response:
+        # 串流上傳：邊讀檔邊送出，不先把整個音檔載入記憶體
+        # （files= 的 multipart 編碼會在送出前把整個檔案緩衝在 RAM）
+        mime_type = "audio/ogg" if upload_path.suffix == ".ogg" else "audio/wav"
+        with open(upload_path, "rb") as f:
+            encoder = MultipartEncoder(
+                fields={"audio": (upload_path.name, f, mime_type)}
             )
+            return SESSION.post(
+                ASR_CREATE_URL,
+                data=encoder,
+                headers={"Content-Type": encoder.content_type},
+                timeout=60,
+            )
+
+    try:
+        # 阻塞的 HTTP 上傳丟到 worker thread，避免卡住 event loop
+        response = await asyncio.to_thread(_upload)
         response.raise_for_status()
         task_id = response.json()["id"]
-        print(f"   ✅ 任務建立成功！任務 ID: {task_id}")
+        logger.info("   ✅ 任務建立成功！任務 ID: %s", task_id)
     except FileNotFoundError:
-        print(f"   ❌ 錯誤：找不到音檔 {audio_path}")
+        logger.error("   ❌ 錯誤：找不到音檔 %s", audio_path)
         raise
     except Exception as e:
-        print(f"   ❌ 上傳失敗: {e}")
+        logger.error("   ❌ 上傳失敗: %s", e)
         raise
     
     # -------- 步驟 2: 等待轉錄完成 --------
     txt_url = f"{ASR_BASE}/api/v1/subtitle/tasks/{task_id}/subtitle?type=TXT"
     srt_url = f"{ASR_BASE}/api/v1/subtitle/tasks/{task_id}/subtitle?type=SRT"
     
-    def wait_download(url: str, file_type: str, max_tries: int = 300) -> str:
-        """等待 ASR 處理完成並下載結果"""
-        print(f"   🔄 等待 {file_type} 轉錄結果...")
-        for i in range(max_tries):
+    def wait_download(url: str, file_type: str, timeout_s: float = 600.0) -> str:
+        """等待 ASR 處理完成並下載結果
+
+        輪詢策略：
+        - 以 time.monotonic 的絕對截止時間控制總等待長度，
+          不受退避間隔變化或單次請求耗時影響
+        - 先用 HEAD 探測狀態（不下載內容），確認就緒後才發 GET 抓完整字幕；
+          伺服器回 405/501 表示不支援 HEAD，之後改為直接 GET
+        - 等待間隔採指數退避（2s → 4s → 8s...，上限 30s）加少量隨機抖動，
+          避免長時間固定頻率輪詢浪費頻寬
+        """
+        logger.info("   🔄 等待 %s 轉錄結果...", file_type)
+        base_delay, max_delay = 2.0, 30.0
+        start = time.monotonic()
+        deadline = start + timeout_s
+        head_supported = True
+        i = 0
+        while time.monotonic() < deadline:
             try:
-                resp = requests.get(url, timeout=(5, 60), auth=ASR_AUTH)
-                if resp.status_code == 200:
-                    print(f"   ✅ {file_type} 轉錄完成！")
-                    return resp.text
+                ready = True
+                if head_supported:
+                    # 先用便宜的 HEAD 探測，避免每次輪詢都下載整個字幕內容
+                    probe = SESSION.head(url, timeout=(5, 60))
+                    if probe.status_code in (405, 501):
+                        # 端點不支援 HEAD：本輪起退回直接 GET
+                        logger.info("   ℹ️ %s 端點不支援 HEAD，改用 GET 輪詢", file_type)
+                        head_supported = False
+                    else:
+                        ready = probe.status_code == 200
+                if ready:
+                    resp = SESSION.get(url, timeout=(5, 60))
+                    if resp.status_code == 200:
+                        logger.info("   ✅ %s 轉錄完成！", file_type)
+                        return resp.text
             except requests.exceptions.ReadTimeout:
                 pass
             except Exception as e:
-                print(f"   ⚠️ 請求錯誤: {e}")
-            
+                logger.warning("   ⚠️ 請求錯誤: %s", e)
+
             if i % 15 == 0 and i > 0:
-                print(f"   ⏳ 仍在處理中... ({i}/{max_tries})")
-            time.sleep(2)
-        
-        print(f"   ⚠️ {file_type} 轉錄超時")
+                logger.info("   ⏳ 仍在處理中... (已等待 %.1f 秒)", time.monotonic() - start)
+
+            # 指數退避 + 抖動，但不睡過截止時間
+            delay = min(max_delay, base_delay * 2 ** min(i, 6))
+            delay += random.uniform(0, 0.5 * delay)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(delay, remaining))
+            i += 1
+
+        logger.warning("   ⚠️ %s 轉錄超時", file_type)
         return ""
-    
-    # 取得 TXT 結果
-    txt_text = wait_download(txt_url, "TXT", max_tries=300)
+
+    # 優先走事件驅動：等到完成事件後，下面的輪詢第一次探測就會命中；
+    # 伺服器不支援事件端點時，此呼叫快速失敗並留給輪詢路徑處理。
+    # 事件等待與輪詢共用同一個絕對截止時間，總等待不超過 ASR_TIMEOUT_S
+    deadline = time.monotonic() + ASR_TIMEOUT_S
+    event_status = await asyncio.to_thread(_wait_done_event, task_id, deadline)
+    if event_status == "failed":
+        raise RuntimeError(f"ASR 任務失敗（任務 ID: {task_id}）")
+
+    remaining = deadline - time.monotonic()
+    if event_status == "done":
+        # 已確認完成，只需保留一小段時間抓字幕本體
+        remaining = max(remaining, 30.0)
+
+    # TXT 與 SRT 是同一任務的兩個獨立輪詢，並行等待可將最壞情況減半
+    txt_text, srt_text = await asyncio.gather(
+        asyncio.to_thread(wait_download, txt_url, "TXT", remaining),
+        asyncio.to_thread(wait_download, srt_url, "SRT", remaining),
+    )
+
     if not txt_text:
         raise TimeoutError("TXT 轉錄逾時或失敗")
-    
-    # 取得 SRT 結果（有時間軸）
-    srt_text = wait_download(srt_url, "SRT", max_tries=300)
-    
-    # -------- 步驟 3: 儲存結果 --------
-    txt_path = out_dir / f"{task_id}.txt"
-    txt_path.write_text(txt_text, encoding="utf-8")
-    print(f"   💾 TXT 已儲存: {txt_path}")
-    
+
+    # -------- 步驟 3: 儲存結果（背景寫入，與 LLM 節點重疊） --------
+    # 檔名使用音檔雜湊，下次處理同一個音檔時可直接命中轉錄快取；
+    # 後續節點從 state 讀內容，不需要等磁碟，writer 節點收尾時才確認寫完
+    pending_writes = []
+    pending_writes.append(asyncio.create_task(
+        asyncio.to_thread(cached_txt_path.write_text, txt_text, encoding="utf-8")
+    ))
+    logger.info("   💾 TXT 寫入中（背景）: %s", cached_txt_path)
+
     if srt_text:
-        srt_path = out_dir / f"{task_id}.srt"
-        srt_path.write_text(srt_text, encoding="utf-8")
-        print(f"   💾 SRT 已儲存: {srt_path}")
-    
-    # 預覽內容
-    print(f"\n   📄 轉錄內容預覽（前 200 字）：")
-    print(f"   {txt_text[:200]}...")
-    
+        pending_writes.append(asyncio.create_task(
+            asyncio.to_thread(cached_srt_path.write_text, srt_text, encoding="utf-8")
+        ))
+        logger.info("   💾 SRT 寫入中（背景）: %s", cached_srt_path)
+
+    # 預覽內容（debug 等級，正式環境預設不輸出）
+    logger.debug("   📄 轉錄內容預覽（前 200 字）: %s...", txt_text[:200])
+
     return {
         "txt_content": txt_text,
-        "srt_content": srt_text or ""
+        "srt_content": srt_text or "",
+        "pending_writes": pending_writes
     }
 
 
-def minutes_taker_node(state: MeetingState) -> dict:
+async def minutes_taker_node(state: MeetingState) -> dict:
     """
     📝 逐字稿節點：產生詳細的時間軸逐字稿
-    
+
     功能：
     - 讀取 SRT 內容（含時間軸）
     - 使用 LLM 整理成表格格式
-    
+    - 與摘要節點並行執行（兩者都只依賴 ASR 結果）
+
     輸入：state["srt_content"] 或 state["txt_content"]
     輸出：detailed_minutes
     """
-    print("\n" + "="*50)
-    print("📝 [逐字稿節點] 產生詳細逐字稿...")
-    print("="*50)
+    logger.info("\n" + "="*50)
+    logger.info("📝 [逐字稿節點] 產生詳細逐字稿...")
+    logger.info("="*50)
     
     srt_content = state.get("srt_content", "")
     txt_content = state.get("txt_content", "")
@@ -174,107 +742,176 @@ def minutes_taker_node(state: MeetingState) -> dict:
     # 優先使用 SRT（有時間軸）
     content_to_process = srt_content if srt_content else txt_content
     
-    # 定義 Prompt
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """你是一位專業的會議記錄員。請將以下語音轉錄內容整理成詳細的逐字稿。
-
-## 輸出要求：
-1. 使用 Markdown 表格格式
-2. 按時間順序列出每一句話
-3. 保留時間戳（如果有的話）
-4. 不要省略任何內容
-5. 使用繁體中文
+    # 先查快取，重跑同一份內容時不必再呼叫 LLM
+    cached = _llm_cache_get(MINUTES_SYSTEM_PROMPT, content_to_process)
+    if cached is not None:
+        logger.info("   ⚡ 命中快取，跳過 LLM 呼叫")
+        return {"detailed_minutes": cached}
 
-## 輸出格式範例：
-## 📋 詳細記錄（Detailed Minutes）
-### 會議發言紀錄 — Podcast
+    if USE_BATCH_API:
+        # 非即時路徑：與摘要節點的請求聚合成同一個 batch
+        result = await BATCHER.submit(MINUTES_SYSTEM_PROMPT, content_to_process)
+    else:
+        # 以模組層級預建的 Chain 串流執行（token 邊到邊寫入部分結果檔）
+        result = await _stream_chain(
+            MINUTES_CHAIN, {"content": content_to_process}, Path("./out/minutes_partial.md")
+        )
+    _llm_cache_put(MINUTES_SYSTEM_PROMPT, content_to_process, result)
 
-| **時間** | **發言內容** |
-|----------|-------------|
-| 00:00:00 - 00:00:03 | 歡迎來到天下文化 podcast，我是阿布阿哥。 |
-| 00:00:03 - 00:00:10 | 今天要介紹一本非常棒的書... |
-"""),
-        ("user", "{content}")
-    ])
-    
-    # 建立 Chain 並執行
-    chain = prompt | llm | StrOutputParser()
-    result = chain.invoke({"content": content_to_process})
-    
-    print("   ✅ 詳細逐字稿產生完成！")
+    logger.info("   ✅ 詳細逐字稿產生完成！")
     
     return {"detailed_minutes": result}
 
 
-def summarizer_node(state: MeetingState) -> dict:
+async def summarizer_node(state: MeetingState) -> dict:
     """
     📊 摘要節點：產生重點摘要
-    
+
     功能：
     - 讀取純文字內容
     - 使用 LLM 歸納重點
-    
+    - 與逐字稿節點並行執行（兩者都只依賴 ASR 結果）
+
     輸入：state["txt_content"]
     輸出：summary
     """
-    print("\n" + "="*50)
-    print("📊 [摘要節點] 產生重點摘要...")
-    print("="*50)
+    logger.info("\n" + "="*50)
+    logger.info("📊 [摘要節點] 產生重點摘要...")
+    logger.info("="*50)
     
     txt_content = state.get("txt_content", "")
     
-    # 定義 Prompt
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """你是一位專業的內容分析師。請閱讀以下語音轉錄內容，並產生一份重點摘要。
+    # 先查快取，重跑同一份內容時不必再呼叫 LLM
+    cached = _llm_cache_get(SUMMARY_SYSTEM_PROMPT, txt_content)
+    if cached is not None:
+        logger.info("   ⚡ 命中快取，跳過 LLM 呼叫")
+        return {"summary": cached}
 
-## 輸出要求：
-1. 開頭標題：## 🎯 重點摘要（Executive Summary）
-2. 列出主題名稱
-3. 歸納 3-5 個關鍵重點
-4. 如果有結論或建議，請標註
-5. 如果有待辦事項，請列出
-6. 使用繁體中文，條列式呈現
+    # exact-match 未命中時，再找近似重複的轉錄（ASR 重跑常有微小差異）
+    near_hit = _semantic_cache_get(txt_content)
+    if near_hit is not None:
+        logger.info("   ⚡ 命中語意快取（近似轉錄），跳過 LLM 呼叫")
+        return {"summary": near_hit}
 
-## 輸出格式範例：
-## 🎯 重點摘要（Executive Summary）
-### 主題：《努力但不費力》Podcast 導讀
+    # 長逐字稿先切塊並行摘要（map），再把各段重點交給最終摘要（reduce）；
+    # 短逐字稿直接走單次摘要
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=SUMMARY_CHUNK_SIZE, chunk_overlap=SUMMARY_CHUNK_OVERLAP
+    )
+    chunks = splitter.split_text(txt_content)
 
-本次會議重點討論了葛瑞格麥乞昂的《努力但不費力》一書。
+    content_for_summary = txt_content
+    if len(chunks) > 1:
+        logger.info("   ✂️ 逐字稿過長，切成 %d 塊並行摘要...", len(chunks))
+        # 以 Semaphore 限制同時進行的 LLM 請求數
+        semaphore = asyncio.Semaphore(SUMMARY_MAX_CONCURRENCY)
 
-**決策結論：**
-* 鼓勵團隊成員重新審視「努力」的定義...
+        async def _summarize_chunk(chunk: str) -> str:
+            async with semaphore:
+                return await SUMMARY_MAP_CHAIN.ainvoke({"content": chunk})
 
-**待辦事項（Action Items）：**
-* 學習「不費力」的三個階段：狀態、行動、成果
-* 反思自身工作模式...
-"""),
-        ("user", "{content}")
-    ])
-    
-    # 建立 Chain 並執行
-    chain = prompt | llm | StrOutputParser()
-    result = chain.invoke({"content": txt_content})
-    
-    print("   ✅ 重點摘要產生完成！")
+        partial_summaries = await asyncio.gather(
+            *[_summarize_chunk(chunk) for chunk in chunks]
+        )
+        content_for_summary = "\n\n".join(partial_summaries)
+
+    if USE_BATCH_API:
+        # 非即時路徑：與逐字稿節點的請求聚合成同一個 batch
+        result = await BATCHER.submit(SUMMARY_SYSTEM_PROMPT, content_for_summary)
+    else:
+        # 以模組層級預建的 Chain 串流執行（token 邊到邊寫入部分結果檔）
+        result = await _stream_chain(
+            SUMMARY_CHAIN, {"content": content_for_summary}, Path("./out/summary_partial.md")
+        )
+    _llm_cache_put(SUMMARY_SYSTEM_PROMPT, txt_content, result)
+    _semantic_cache_put(txt_content, result)
+
+    logger.info("   ✅ 重點摘要產生完成！")
     
     return {"summary": result}
 
 
-def writer_node(state: MeetingState) -> dict:
+async def report_node(state: MeetingState) -> dict:
+    """
+    🧾 融合節點：一次 LLM 呼叫同時產生摘要與逐字稿
+
+    功能：
+    - 以結構化輸出（summary + detailed_minutes）取代兩次完整 prompt
+    - 冗長的轉錄內容只送進 LLM 一次，token 成本約減半
+
+    輸入：state["srt_content"] 或 state["txt_content"]
+    輸出：summary, detailed_minutes
+    """
+    logger.info("\n" + "="*50)
+    logger.info("🧾 [融合節點] 一次產生摘要與逐字稿...")
+    logger.info("="*50)
+
+    srt_content = state.get("srt_content", "")
+    txt_content = state.get("txt_content", "")
+
+    # 優先使用 SRT（有時間軸）
+    content_to_process = srt_content if srt_content else txt_content
+
+    # 先查快取（融合結果以 JSON 形式存放）
+    cached = _llm_cache_get(REPORT_SYSTEM_PROMPT, content_to_process)
+    if cached is not None:
+        logger.info("   ⚡ 命中快取，跳過 LLM 呼叫")
+        data = _json_loads(cached)
+        return {
+            "summary": data["summary"],
+            "detailed_minutes": data["detailed_minutes"],
+        }
+
+    if USE_BATCH_API:
+        # 非即時路徑：以 json_schema 回應格式走 Batch，結構化輸出不變
+        raw = await BATCHER.submit(
+            REPORT_SYSTEM_PROMPT,
+            content_to_process,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "Report",
+                    "schema": Report.model_json_schema(),
+                },
+            },
+        )
+        report = Report.model_validate_json(raw)
+    else:
+        report = await REPORT_CHAIN.ainvoke({"content": content_to_process})
+    _llm_cache_put(
+        REPORT_SYSTEM_PROMPT,
+        content_to_process,
+        json.dumps(report.model_dump(), ensure_ascii=False),
+    )
+
+    logger.info("   ✅ 摘要與逐字稿產生完成！")
+
+    return {
+        "summary": report.summary,
+        "detailed_minutes": report.detailed_minutes,
+    }
+
+
+async def writer_node(state: MeetingState) -> dict:
     """
     📄 寫作節點：整合最終報告
-    
+
     功能：
+    - 等待背景磁碟寫入完成
     - 合併逐字稿和摘要
     - 產生完整的會議報告
-    
-    輸入：state["detailed_minutes"], state["summary"]
+
+    輸入：state["detailed_minutes"], state["summary"], state["pending_writes"]
     輸出：final_report
     """
-    print("\n" + "="*50)
-    print("📄 [寫作節點] 整合最終報告...")
-    print("="*50)
-    
+    logger.info("\n" + "="*50)
+    logger.info("📄 [寫作節點] 整合最終報告...")
+    logger.info("="*50)
+
+    # 確認 ASR 結果的背景寫入都已落地
+    for write_task in state.get("pending_writes", []):
+        await write_task
+
     detailed_minutes = state.get("detailed_minutes", "")
     summary = state.get("summary", "")
     
@@ -295,7 +932,7 @@ def writer_node(state: MeetingState) -> dict:
 *產生時間：{time.strftime("%Y-%m-%d %H:%M:%S")}*
 """
     
-    print("   ✅ 最終報告整合完成！")
+    logger.info("   ✅ 最終報告整合完成！")
     
     return {"final_report": final_report}
 
@@ -309,70 +946,95 @@ def build_meeting_graph():
     
     圖結構說明：
     - asr: 語音轉文字
-    - minutes_taker: 產生逐字稿
-    - summarizer: 產生摘要
+    - report: 一次 LLM 呼叫產生摘要＋逐字稿（FUSE_LLM_CALLS=True）
+    - minutes_taker: 產生逐字稿（FUSE_LLM_CALLS=False 時使用）
+    - summarizer: 產生摘要（FUSE_LLM_CALLS=False 時使用）
     - writer: 整合報告
-    
-    執行流程：asr -> minutes_taker -> summarizer -> writer -> END
+
+    執行流程（融合模式，轉錄內容只送 LLM 一次）：
+        asr -> report -> writer -> END
+
+    執行流程（雙節點模式，逐字稿與摘要並行）：
+        asr -> minutes_taker ┐
+        asr -> summarizer    ┴-> writer -> END
     """
-    print("\n🔧 建立 LangGraph 工作流程...")
-    
+    logger.info("\n🔧 建立 LangGraph 工作流程...")
+
     # 初始化 StateGraph
     workflow = StateGraph(MeetingState)
-    
+
     # 加入節點
     workflow.add_node("asr", asr_node)
-    workflow.add_node("minutes_taker", minutes_taker_node)
-    workflow.add_node("summarizer", summarizer_node)
     workflow.add_node("writer", writer_node)
-    
+
     # 設定入口點
     workflow.set_entry_point("asr")
-    
-    # 設定邊（Edge）- 定義節點間的流向
-    workflow.add_edge("asr", "minutes_taker")
-    workflow.add_edge("minutes_taker", "summarizer")
-    workflow.add_edge("summarizer", "writer")
+
+    if FUSE_LLM_CALLS:
+        # 融合模式：摘要與逐字稿在同一個結構化輸出呼叫完成
+        workflow.add_node("report", report_node)
+        workflow.add_edge("asr", "report")
+        workflow.add_edge("report", "writer")
+    else:
+        # 雙節點模式：asr 之後分岔成兩條並行分支，LangGraph 會同時執行
+        workflow.add_node("minutes_taker", minutes_taker_node)
+        workflow.add_node("summarizer", summarizer_node)
+        workflow.add_edge("asr", "minutes_taker")
+        workflow.add_edge("asr", "summarizer")
+        # 兩條分支都完成後才進入 writer（fan-in）
+        workflow.add_edge(["minutes_taker", "summarizer"], "writer")
     workflow.add_edge("writer", END)
     
     # 編譯 Graph
     app = workflow.compile()
-    
-    print("   ✅ Graph 建立完成！")
-    
+
+    logger.info("   ✅ Graph 建立完成！")
+
     return app
 
 
+# 已編譯 Graph 的單例：重複呼叫（例如包成 API 服務時）不必重新編譯
+_APP = None
+
+
+def get_app():
+    """回傳共用的已編譯 Graph（首次呼叫時才建立）"""
+    global _APP
+    if _APP is None:
+        _APP = build_meeting_graph()
+    return _APP
+
+
 # ============================================
 # 5. 主程式
 # ============================================
-def main():
+async def main():
     """主程式進入點"""
     
-    print("\n" + "="*60)
-    print("🚀 智慧會議記錄助手 - LangGraph 版本")
-    print("="*60)
+    logger.info("\n" + "="*60)
+    logger.info("🚀 智慧會議記錄助手 - LangGraph 版本")
+    logger.info("="*60)
     
-    # 建立 Graph
-    app = build_meeting_graph()
+    # 取得共用的已編譯 Graph
+    app = get_app()
     
     # 顯示 Graph 結構
     try:
-        print("\n📊 Graph 結構圖：")
-        print(app.get_graph().draw_ascii())
+        logger.info("\n📊 Graph 結構圖：")
+        logger.info(app.get_graph().draw_ascii())
     except Exception:
-        print("（提示：安裝 grandalf 套件可顯示 ASCII 圖形）")
-        print("   pip install grandalf")
+        logger.info("（提示：安裝 grandalf 套件可顯示 ASCII 圖形）")
+        logger.info("   pip install grandalf")
     
     # 檢查音檔是否存在
     audio_path = Path(AUDIO_PATH)
     if not audio_path.exists():
-        print(f"\n❌ 錯誤：找不到音檔 {AUDIO_PATH}")
-        print("請確認音檔路徑是否正確，或修改 AUDIO_PATH 變數")
+        logger.error("\n❌ 錯誤：找不到音檔 %s", AUDIO_PATH)
+        logger.error("請確認音檔路徑是否正確，或修改 AUDIO_PATH 變數")
         return
     
-    print(f"\n📁 音檔路徑: {AUDIO_PATH}")
-    print(f"📁 輸出目錄: ./out/")
+    logger.info("\n📁 音檔路徑: %s", AUDIO_PATH)
+    logger.info("📁 輸出目錄: ./out/")
     
     # 初始化狀態
     initial_state: MeetingState = {
@@ -381,28 +1043,27 @@ def main():
         "srt_content": "",
         "detailed_minutes": "",
         "summary": "",
-        "final_report": ""
+        "final_report": "",
+        "pending_writes": []
     }
     
     # 執行 Graph
-    print("\n" + "-"*60)
-    print("🎬 開始執行工作流程...")
-    print("-"*60)
-    
-    # 使用 stream 觀察每個節點的執行
-    for event in app.stream(initial_state):
-        for node_name in event.keys():
-            print(f"\n✅ 節點 [{node_name}] 執行完成")
+    logger.info("\n" + "-"*60)
+    logger.info("🎬 開始執行工作流程...")
+    logger.info("-"*60)
     
-    # 取得最終結果
-    final_state = app.invoke(initial_state)
+    # 單次 astream 執行：邊觀察進度邊累積最終狀態
+    # （舊版先 stream 再 invoke，等於整個流程跑兩遍、LLM/ASR 成本翻倍）
+    final_state: MeetingState | None = None
+    async for event in app.astream(initial_state, stream_mode="values"):
+        final_state = event
     
     # 顯示最終報告
-    print("\n" + "="*60)
-    print("📋 最終報告")
-    print("="*60)
-    final_report = final_state.get("final_report", "無報告")
-    print(final_report)
+    logger.info("\n" + "="*60)
+    logger.info("📋 最終報告")
+    logger.info("="*60)
+    final_report = (final_state or {}).get("final_report", "無報告")
+    logger.info("%s", final_report)
     
     # 儲存報告
     out_dir = Path("./out")
@@ -410,12 +1071,12 @@ def main():
     report_path = out_dir / "meeting_report.md"
     report_path.write_text(final_report, encoding="utf-8")
     
-    print("\n" + "="*60)
-    print(f"✅ 報告已儲存至: {report_path}")
-    print("="*60)
+    logger.info("\n" + "="*60)
+    logger.info("✅ 報告已儲存至: %s", report_path)
+    logger.info("="*60)
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
 
 